@@ -1,15 +1,21 @@
 import os
+import re
 import sys
+import threading
 import multiprocessing
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from main_zhihu import ZhihuParser
 from tqdm import tqdm
-from functools import partial
 from pathlib import Path
+from uuid import uuid4
 
 # Configuration
 COOKIES_FILE = "cookies.txt"
 MAX_PROCESSES = multiprocessing.cpu_count()
+# Downloads are network-bound, so each worker process multiplexes a batch of
+# URLs across this many threads; socket reads release the GIL
+THREADS_PER_PROCESS = 32
 
 # Path configuration
 BASE_DIR = Path("zhihu")
@@ -45,41 +51,98 @@ def read_cookies_from_file(file_path):
             sys.exit(1)
         return cookies
 
+# One compiled pattern covering the four URL shapes; a single C-level scan
+# replaces the cascade of substring searches and split allocations per URL.
+_ARTICLE_RE = re.compile(
+    r'(?:zhuanlan\.zhihu\.com/p/(?P<p>[^/?#]+))'
+    r'|(?:question/[^/?#]+/answer/(?P<a>[^/?#]+))'
+    r'|(?:zvideo/(?P<z>[^/?#]+))'
+    r'|(?:column/(?P<c>[^/?#]+))'
+)
+
 def get_article_id(url):
     """Extract article ID from URL."""
-    if 'zhuanlan.zhihu.com/p/' in url:
-        return url.split('zhuanlan.zhihu.com/p/')[-1].split('/')[0]
-    elif 'question' in url and 'answer' in url:
-        return url.split('answer/')[-1].split('/')[0]
-    elif 'zvideo' in url:
-        return url.split('zvideo/')[-1].split('/')[0]
-    elif 'column' in url:
-        return url.split('column/')[-1].split('/')[0]
-    return None
-
-def article_exists(article_id, output_dir):
-    """Check if article already exists in output directory."""
-    for root, dirs, files in os.walk(output_dir):
-        if article_id in root:
-            return True
-    return False
-
-def process_single_url(url, cookies, output_dir):
+    m = _ARTICLE_RE.search(url)
+    return m.group(m.lastgroup) if m else None
+
+MANIFEST_NAME = ".manifest"
+
+def collect_existing_ids(output_dir):
+    """Scan the output directory once and collect IDs of already-downloaded articles."""
+    with os.scandir(output_dir) as it:
+        return {e.name for e in it if e.is_dir()}
+
+def load_manifest(output_dir):
+    """Load IDs of completed articles from the manifest in output_dir."""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return set()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+# Per-worker state populated once by _worker_init, so task messages carry
+# only the URL instead of re-pickling cookies and paths for every task.
+_worker_ctx = {}
+
+def _worker_init(cookies, output_dir, temp_dir, existing_ids, manifest_lock):
+    """Store shared state in the worker process at pool start."""
+    # Resolve to absolute paths so concurrent threads never depend on the
+    # process-wide working directory
+    output_dir = os.path.abspath(output_dir)
+    temp_dir = os.path.abspath(temp_dir)
+    _worker_ctx['cookies'] = cookies
+    _worker_ctx['output_dir'] = output_dir
+    _worker_ctx['temp_dir'] = temp_dir
+    _worker_ctx['existing_ids'] = existing_ids
+    _worker_ctx['manifest_path'] = os.path.join(output_dir, MANIFEST_NAME)
+    _worker_ctx['manifest_lock'] = manifest_lock
+    # Long-lived thread pool; its threads (and their parsers) are reused
+    # across every batch this worker handles
+    _worker_ctx['executor'] = ThreadPoolExecutor(max_workers=THREADS_PER_PROCESS)
+    _worker_ctx['local'] = threading.local()
+
+def _get_parser():
+    """Return this thread's ZhihuParser, creating it on first use.
+
+    requests.Session is not thread-safe, so each pool thread keeps its own
+    parser; the session still reuses connections across that thread's URLs.
+    """
+    local = _worker_ctx['local']
+    if getattr(local, 'parser', None) is None:
+        local.parser = ZhihuParser(cookies=_worker_ctx['cookies'], keep_logs=False,
+                                   temp_dir=_worker_ctx['temp_dir'],
+                                   output_dir=_worker_ctx['output_dir'])
+    return local.parser
+
+def process_url_batch(batch):
+    """Process a batch of URLs concurrently on this worker's thread pool."""
+    return list(_worker_ctx['executor'].map(process_single_url, batch))
+
+def process_single_url(url):
     """Process a single URL using ZhihuParser."""
     article_id = get_article_id(url)
     if not article_id:
         return url, False, "Invalid URL format"
 
-    if article_exists(article_id, output_dir):
+    if article_id in _worker_ctx['existing_ids']:
         return url, True, "Article already exists"
 
-    parser = ZhihuParser(cookies=cookies, keep_logs=False, temp_dir=str(TEMP_DIR), output_dir=str(output_dir))
     try:
-        parser.judge_type(url)
-        return url, True, None
+        title = _get_parser().judge_type(url)
     except Exception as e:
         return url, False, str(e)
 
+    # Some parser paths (e.g. zvideo) report failure by returning None
+    # rather than raising; don't record those, so later runs retry them
+    if title is None:
+        return url, False, "Parser returned no result"
+
+    # Record the completed article so later runs resume in O(1) per URL
+    with _worker_ctx['manifest_lock']:
+        with open(_worker_ctx['manifest_path'], 'a', encoding='utf-8') as f:
+            f.write(article_id + '\n')
+    return url, True, None
+
 def process_urls(urls, cookies, output_dir):
     """Process a list of URLs using ZhihuParser in parallel using multiprocessing."""
     success_count = 0
@@ -87,38 +150,65 @@ def process_urls(urls, cookies, output_dir):
     skipped_count = 0
     failed_urls = []
 
-    # Create a partial function with cookies and output_dir pre-filled
-    process_func = partial(process_single_url, cookies=cookies, output_dir=output_dir)
+    # The manifest of completed article IDs plus a one-time directory scan
+    # give workers O(1) membership tests with no per-URL filesystem probing
+    existing_ids = collect_existing_ids(output_dir) | load_manifest(output_dir)
+    manifest_lock = multiprocessing.Lock()
+
+    # Hand workers whole batches so each worker keeps THREADS_PER_PROCESS
+    # downloads in flight; batching also amortizes the per-message IPC
+    # pickling cost
+    batches = [urls[i:i + THREADS_PER_PROCESS]
+               for i in range(0, len(urls), THREADS_PER_PROCESS)]
+    chunksize = max(1, len(batches) // (MAX_PROCESSES * 8))
 
-    # Create a pool of workers
-    with multiprocessing.Pool(processes=MAX_PROCESSES) as pool:
+    # Create a pool of workers; cookies and paths go to each worker once via
+    # the initializer instead of riding along in every task
+    with multiprocessing.Pool(processes=MAX_PROCESSES, initializer=_worker_init,
+                              initargs=(cookies, str(output_dir), str(TEMP_DIR),
+                                        existing_ids, manifest_lock)) as pool:
         # Create a list of tasks
-        tasks = pool.imap_unordered(process_func, urls)
-        
+        tasks = pool.imap_unordered(process_url_batch, batches, chunksize=chunksize)
+
         # Process results with progress bar
-        with tqdm(total=len(urls), desc="Processing URLs", 
+        with tqdm(total=len(urls), desc="Processing URLs",
                  bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]') as pbar:
-            for url, success, error in tasks:
+            for url, success, error in (result for batch in tasks for result in batch):
                 if success:
                     if error == "Article already exists":
                         skipped_count += 1
-                        pbar.set_postfix({'Status': 'Skipped', 'Failed': failure_count})
+                        status = 'Skipped'
                     else:
                         success_count += 1
-                        pbar.set_postfix({'Status': 'Success', 'Failed': failure_count})
+                        status = 'Success'
                 else:
                     failure_count += 1
                     failed_urls.append((url, error))
-                    pbar.set_postfix({'Status': 'Failed', 'Failed': failure_count})
+                    status = 'Failed'
                 pbar.update(1)
+                # Refresh the postfix only occasionally: rendering it forces
+                # a full bar redraw per result, which becomes the parent's
+                # bottleneck when workers finish quickly
+                if pbar.n % 50 == 0 or pbar.n == len(urls):
+                    pbar.set_postfix({'Status': status, 'Failed': failure_count})
 
     return success_count, failure_count, skipped_count, failed_urls
 
 def cleanup_temp_files():
     """Clean up temporary zip files."""
+    # Sweep stale directories left behind if an earlier run exited before
+    # its background removal finished
+    stale_dirs = list(BASE_DIR.glob(TEMP_DIR.name + '.stale.*'))
     if TEMP_DIR.exists():
-        shutil.rmtree(TEMP_DIR)
+        # Rename is a single syscall no matter how full the directory is;
+        # the per-file unlinking happens off the critical path
+        stale = TEMP_DIR.with_suffix('.stale.' + uuid4().hex)
+        TEMP_DIR.rename(stale)
         os.makedirs(TEMP_DIR)
+        stale_dirs.append(stale)
+    for stale in stale_dirs:
+        threading.Thread(target=shutil.rmtree, args=(stale,),
+                         kwargs={'ignore_errors': True}, daemon=True).start()
 
 def process_url_file(url_file, cookies):
     """Process a single URL file."""
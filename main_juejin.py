@@ -64,7 +64,7 @@ class JuejinParser:
             self.log('error', f"Error occurred: {err}")
             raise
 
-        self.soup = BeautifulSoup(response.content, "html.parser")
+        self.soup = BeautifulSoup(response.content, "lxml")
 
     def judge_type(self, target_link):
         """
@@ -70,7 +70,7 @@ class ZhihuParser:
             self.log('error', f"Error occurred: {err}")
             raise
 
-        self.soup = BeautifulSoup(response.content, "html.parser")
+        self.soup = BeautifulSoup(response.content, "lxml")
         if self.soup.text.find("有问题，就会有答案打开知乎App在「我的页」右上角打开扫一扫其他扫码方式") != -1:
             self.log('warning', "Cookies are required to access the article.")
             raise ValueError("Cookies are required to access the article.")
@@ -281,6 +281,10 @@ class ZhihuParser:
 
             markdown_title = f"({date}){data['authorName']}_{data['title']}/{data['authorName']}_{data['title']}.mp4"
 
+            # Use output_dir if specified
+            if self.output_dir:
+                markdown_title = os.path.join(self.output_dir, markdown_title)
+
             video_url = None
             script = self.soup.find('script', id='js-initialData')
             if script:
@@ -376,6 +380,8 @@ class ZhihuParser:
         """
         解析知乎专栏并保存为 Markdown 格式文件
         """
+        folder_name = None
+        saved_output_dir = self.output_dir
         try:
             self.check_connect_error(target_link)
 
@@ -392,13 +398,18 @@ class ZhihuParser:
                 self.log('warning', "Could not determine total article count, using undefined count")
 
             folder_name = get_valid_filename(title)
+            # 不使用 os.chdir：工作目录是进程级状态，会影响同进程的
+            # 其他线程，这里改为显式拼接专栏文件夹路径
+            if self.output_dir:
+                folder_name = os.path.join(self.output_dir, folder_name)
             os.makedirs(folder_name, exist_ok=True)
-            os.chdir(folder_name)
 
-            processed_filename = "zhihu_processed_articles.txt"
+            processed_filename = os.path.join(
+                folder_name, "zhihu_processed_articles.txt")
             processed_articles = self.load_processed_articles(
                 processed_filename)
-            failed_articles_filename = "zhihu_failed_articles.txt"
+            failed_articles_filename = os.path.join(
+                folder_name, "zhihu_failed_articles.txt")
 
             # 读取失败的文章列表，用于记录
             failed_articles = set()
@@ -423,6 +434,9 @@ class ZhihuParser:
                 # 如果无法确定总数，就使用一个无限进度条
                 progress_bar = tqdm(desc=progress_desc)
 
+            # 嵌套解析的文章/视频通过 output_dir 写入专栏文件夹
+            self.output_dir = folder_name
+
             while True:
                 try:
                     api_url = f"/api/v4/columns/{target_link.split('/')[-1]}/items?limit=10&offset={offset}"
@@ -501,8 +515,12 @@ class ZhihuParser:
             return folder_name
         except Exception as e:
             self.log('error', f"Error parsing column {target_link}: {str(e)}")
-            # 在这种情况下，返回当前文件夹名，以便打包已下载的内容
+            # 在这种情况下，返回文件夹名，以便打包已下载的内容
+            if folder_name:
+                return folder_name
             return os.path.basename(os.getcwd())
+        finally:
+            self.output_dir = saved_output_dir
 
 
 if __name__ == "__main__":
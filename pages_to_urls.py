@@ -5,7 +5,8 @@
 extract_zhihu_batch_urls.py
 
 Batch-extract Zhihu URLs from HTML files under pages/<category>/*.html,
-applying in one loop per file both:
+streaming each file through lxml's event-driven parser (no DOM is built)
+and applying in one pass per file both:
   1. <meta itemprop="url"> immediately followed by
      <meta itemprop="datePublished"> OR <meta itemprop="dateModified">
   2. <a target="_blank" data-za-detail-view-element_name="Title">
@@ -15,72 +16,145 @@ Normalize protocol-relative URLs (//…) to https://…, de-duplicate per catego
 
 import os
 import sys
-from bs4 import BeautifulSoup, NavigableString, Comment
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from pybloom_live import ScalableBloomFilter
+
+MAX_PROCESSES = multiprocessing.cpu_count()
+
+# Defaults for the per-category dedup filter; tune via CLI for large crawls.
+BLOOM_INITIAL_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 1e-7
+
+# Hoisted out of the hot per-tag loop: hashed membership test, no tuple
+# rebuild or pairwise string comparisons per meta tag.
+_DATE_PROPS = frozenset(('datePublished', 'dateModified'))
 
 def normalize(raw: str) -> str:
     raw = raw.strip()
     return 'https:' + raw if raw.startswith('//') else raw
 
-def extract_urls_from_soup(soup, seen):
+def parse_one_file(path):
+    """Parse one HTML file and return its URLs in document order, deduped within the file."""
+    seen = set()
     out = []
-    for tag in soup.find_all(True):
-        # Case 1: <meta itemprop="url"> + next meta@datePublished
-        if tag.name == 'meta' and tag.get('itemprop') == 'url':
-            raw = tag.get('content', '').strip()
-            if raw:
-                sib = tag.next_sibling
-                while isinstance(sib, (NavigableString, Comment)):
-                    sib = sib.next_sibling
-                if (
-                        getattr(sib, 'name', None) == 'meta' and
-                        sib.get('itemprop') in ('datePublished', 'dateModified')
-                ):
-                    url = normalize(raw)
-                    if url not in seen:
-                        seen.add(url)
-                        out.append(url)
-
-        # Case 2: <a target="_blank" data-za-detail-view-element_name="Title">
-        elif tag.name == 'a' \
-             and tag.get('target') == '_blank' \
-             and tag.get('data-za-detail-view-element_name') == 'Title':
-            raw = tag.get('href', '').strip()
-            if raw:
-                url = normalize(raw)
-                if url not in seen:
-                    seen.add(url)
-                    out.append(url)
+    # Last <meta itemprop="url"> element and its content, consumed only if
+    # the matching datePublished/dateModified meta is its next sibling.
+    pending = None
+    # Binary mode with a 1MB buffer: no per-chunk UTF-8 decode, and far
+    # fewer read syscalls than the default 8KiB buffering.
+    try:
+        with open(path, 'rb', buffering=1024 * 1024) as f:
+            # Only meta/a tags produce Python-level events; everything else
+            # is handled entirely inside lxml's C parser. Sibling adjacency
+            # is checked on the tree (getnext) since intervening tags are no
+            # longer seen as events.
+            for event, tag in etree.iterparse(f, events=('start', 'end'),
+                                              html=True, tag=('meta', 'a')):
+                if event == 'end':
+                    # Prune everything parsed before this element so memory
+                    # stays bounded regardless of the document size.
+                    tag.clear(keep_tail=True)
+                    parent = tag.getparent()
+                    if parent is not None:
+                        while tag.getprevious() is not None:
+                            del parent[0]
+                    continue
+
+                # Case 1: <meta itemprop="url"> + next meta@datePublished
+                if tag.tag == 'meta':
+                    itemprop = tag.get('itemprop')
+                    if itemprop == 'url':
+                        raw = tag.get('content', '').strip()
+                        pending = (tag, raw) if raw else None
+                    elif pending is not None and itemprop in _DATE_PROPS:
+                        url_tag, raw = pending
+                        # Skip comments/PIs (non-string .tag) between the two
+                        # metas, like the old NavigableString/Comment walk did
+                        sib = url_tag.getnext()
+                        while sib is not None and not isinstance(sib.tag, str):
+                            sib = sib.getnext()
+                        if sib is tag:
+                            url = normalize(raw)
+                            if url not in seen:
+                                seen.add(url)
+                                out.append(url)
+                        pending = None
+
+                # Case 2: <a target="_blank" data-za-detail-view-element_name="Title">
+                elif tag.tag == 'a' \
+                     and tag.get('target') == '_blank' \
+                     and tag.get('data-za-detail-view-element_name') == 'Title':
+                    raw = tag.get('href', '').strip()
+                    if raw:
+                        url = normalize(raw)
+                        if url not in seen:
+                            seen.add(url)
+                            out.append(url)
+    except etree.XMLSyntaxError:
+        # Empty or hopelessly malformed saved pages made bs4 yield an empty
+        # document; do the same here instead of propagating an exception,
+        # which lxml errors don't even survive pickling back from workers.
+        pass
     return out
 
-def main(input_dir='zhihu/pages', output_dir='zhihu/urls'):
+def main(input_dir='zhihu/pages', output_dir='zhihu/urls',
+         bloom_capacity=BLOOM_INITIAL_CAPACITY, bloom_error_rate=BLOOM_ERROR_RATE):
     if not os.path.isdir(input_dir):
         sys.exit(f"Error: input directory '{input_dir}' not found. Create it and put your category subfolders inside.")
 
     os.makedirs(output_dir, exist_ok=True)
 
-    for category in sorted(os.listdir(input_dir)):
-        cat_path = os.path.join(input_dir, category)
-        if not os.path.isdir(cat_path):
-            continue
-
-        seen = set()
-        merged = []
+    # Discover all (category, file) pairs first so parsing can be farmed out
+    # to worker processes in one batch.
+    # os.scandir caches the entry type from the readdir call, avoiding the
+    # extra stat syscall per entry that listdir + isdir would issue.
+    category_files = {}
+    with os.scandir(input_dir) as it:
+        categories = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+    for category in categories:
+        with os.scandir(category.path) as it:
+            html_entries = sorted(
+                (e for e in it if e.is_file() and e.name.lower().endswith('.html')),
+                key=lambda e: e.name)
+        category_files[category.name] = [e.path for e in html_entries]
 
-        # process each .html in sorted order
-        for fn in sorted(f for f in os.listdir(cat_path) if f.lower().endswith('.html')):
-            full = os.path.join(cat_path, fn)
-            with open(full, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-            result = extract_urls_from_soup(soup, seen)
-            merged += result
-            print(f'Processed {len(result)} pages for {fn}')
+    # Parsing is CPU-bound and embarrassingly parallel. executor.map yields
+    # each file's result in submission order, so URLs can be deduped and
+    # written to disk as they arrive instead of buffering a merged list:
+    # memory stays bounded by the in-flight results, not the category size.
+    with ProcessPoolExecutor(max_workers=MAX_PROCESSES) as executor:
+        for category, paths in category_files.items():
+            # Bloom filter instead of a set of full URL strings: a few bits
+            # per URL rather than 100+ bytes, at a tunable false-positive rate.
+            seen = ScalableBloomFilter(initial_capacity=bloom_capacity,
+                                       error_rate=bloom_error_rate)
+            written = 0
 
-        out_file = os.path.join(output_dir, f"{category}.txt")
-        with open(out_file, 'w', encoding='utf-8') as out:
-            for url in merged:
-                out.write(url + "\n")
+            out_file = os.path.join(output_dir, f"{category}.txt")
+            with open(out_file, 'w', encoding='utf-8', buffering=1024 * 1024) as out:
+                for full, result in zip(paths, executor.map(parse_one_file, paths)):
+                    for url in result:
+                        if url not in seen:
+                            seen.add(url)
+                            out.write(url)
+                            out.write("\n")
+                            written += 1
+                    print(f'Processed {len(result)} pages for {os.path.basename(full)}')
 
-        print(f"[{category}] → {len(merged)} URLs → {out_file}")
+            print(f"[{category}] → {written} URLs → {out_file}")
 
 if __name__ == '__main__':
-    main()
+    # Required for Windows multiprocessing
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Extract Zhihu URLs from saved listing pages.")
+    parser.add_argument('--input-dir', default='zhihu/pages')
+    parser.add_argument('--output-dir', default='zhihu/urls')
+    parser.add_argument('--bloom-capacity', type=int, default=BLOOM_INITIAL_CAPACITY,
+                        help="Initial capacity of the per-category dedup filter.")
+    parser.add_argument('--bloom-error-rate', type=float, default=BLOOM_ERROR_RATE,
+                        help="Target false-positive rate of the dedup filter.")
+    args = parser.parse_args()
+    main(args.input_dir, args.output_dir, args.bloom_capacity, args.bloom_error_rate)